@@ -1,10 +1,21 @@
+import itertools
 import os
+import re
 import sys
-import json
+import asyncio
 import argparse
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from typing import Dict, List, Any, Tuple, Optional
 
+import orjson
 import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.constants import FieldFlag, FieldType
 from dotenv import load_dotenv, find_dotenv
 from loguru import logger
 from mcp.server.fastmcp import FastMCP
@@ -14,11 +25,77 @@ DEFAULT_MAX_ROWS = 100
 DEFAULT_PORT = 8888
 DEFAULT_MYSQL_PORT = 13306
 DEFAULT_MAX_LENGTH = 10000  # 出力テキストの最大文字数
+DEFAULT_MAX_QUERY_LENGTH = 262144  # 受け付けるクエリの最大文字数
+DEFAULT_POOL_SIZE = 8
+DEFAULT_RESULT_CACHE_SIZE = 128  # キャッシュするクエリ結果の件数（0で無効）
+DEFAULT_RESULT_CACHE_TTL = 60  # キャッシュしたクエリ結果の有効秒数（0で無効）
+POOL_NAME = "mcp"
+ROW_LIMIT_MESSAGE = "(行数制限により以降は省略されています。max_rows を増やして再実行してください)"
+CHAR_LIMIT_MESSAGE = "(文字数制限により以降は省略。より多くの結果を表示するには別のクエリを使用してください。)"
+
+# コミットが必要なデータ変更クエリの先頭キーワード
+DML_PATTERN = re.compile(
+    r"\s*(INSERT|UPDATE|DELETE|CREATE|DROP|ALTER|REPLACE|TRUNCATE|GRANT|REVOKE)\b",
+    re.IGNORECASE
+)
+
+# データを変更しない読み取り専用クエリの先頭キーワード
+READ_ONLY_PATTERN = re.compile(r"\s*(SELECT|SHOW|DESCRIBE|DESC|EXPLAIN)\b", re.IGNORECASE)
+
+# SHOW のうち、実行時の状態ではなくスキーマ定義などを返すためキャッシュしてよいもの
+SHOW_PATTERN = re.compile(r"\s*SHOW\b", re.IGNORECASE)
+CACHEABLE_SHOW_PATTERN = re.compile(
+    r"\s*SHOW\s+(EXTENDED\s+)?(FULL\s+)?"
+    r"(TABLES|DATABASES|SCHEMAS|COLUMNS|FIELDS|INDEX|INDEXES|KEYS|CREATE|TRIGGERS"
+    r"|CHARACTER\s+SET|CHARSET|COLLATION|ENGINES|PLUGINS|PRIVILEGES|GRANTS)\b",
+    re.IGNORECASE
+)
+# 結果が実行のたびに変わる、またはデータの読み取り以外の作用を持つため結果をキャッシュしないクエリ
+UNCACHEABLE_PATTERN = re.compile(
+    r"\b(INTO|FOR\s+UPDATE|FOR\s+SHARE|LOCK\s+IN\s+SHARE\s+MODE|ANALYZE"
+    r"|NOW|SYSDATE|CURRENT_TIMESTAMP|CURRENT_DATE|CURRENT_TIME|CURDATE|CURTIME"
+    r"|UTC_TIMESTAMP|UTC_DATE|UTC_TIME|LOCALTIME|LOCALTIMESTAMP|UNIX_TIMESTAMP"
+    r"|RAND|UUID|UUID_SHORT|CONNECTION_ID|LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT"
+    r"|SLEEP|GET_LOCK|RELEASE_LOCK|IS_FREE_LOCK|IS_USED_LOCK"
+    r"|PERFORMANCE_SCHEMA|PROCESSLIST)\b|@@",
+    re.IGNORECASE
+)
+
+# LIMIT を付け足せる SELECT クエリの判定用
+SELECT_PATTERN = re.compile(r"\s*SELECT\b", re.IGNORECASE)
+UNLIMITABLE_PATTERN = re.compile(
+    r"\b(LIMIT|INTO|FOR\s+UPDATE|FOR\s+SHARE|LOCK\s+IN\s+SHARE\s+MODE)\b|;",
+    re.IGNORECASE
+)
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# バイナリ文字セットの場合にbytesとして返されるカラム型
+BINARY_FIELD_TYPES = frozenset(FieldType.get_binary_types() + [
+    FieldType.VAR_STRING,
+    FieldType.STRING,
+    FieldType.GEOMETRY,
+])
+
+# .env は起動時に一度だけ読み込む（.env の変更を反映するにはサーバーの再起動が必要）
+load_dotenv(find_dotenv(), override=False)
+_CONFIG: Dict[str, str] = dict(os.environ)
 
 logger.remove()
-logger.add(sys.stderr, level=os.getenv("FASTMCP_LOG_LEVEL", "WARNING"))
+logger.add(sys.stderr, level=_CONFIG.get("FASTMCP_LOG_LEVEL", "WARNING"))
 logger = logger.bind(module="mysql_mcp")
 
+# プロセス全体で共有するコネクションプールと、DB処理を実行するスレッドプール（初回接続時に作成）
+_pool: Optional[pooling.MySQLConnectionPool] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# フォーマット済みクエリ結果と保存時刻のキャッシュ（古いものから追い出す）
+_result_cache: "OrderedDict[Tuple[str, int], Tuple[float, str]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+# キャッシュを破棄するたびに進める世代番号（破棄前に実行されたクエリの結果を保存しないため）
+_result_cache_generation = 0
+
 # 環境変数を読み込む関数
 def load_env_vars(keys: List[str]) -> Dict[str, str]:
     """必要な環境変数を読み込む
@@ -32,8 +109,7 @@ def load_env_vars(keys: List[str]) -> Dict[str, str]:
     Raises:
         ValueError: 必要な環境変数が設定されていない場合
     """
-    load_dotenv(find_dotenv())
-    values = {key: os.getenv(key) for key in keys}
+    values = {key: _CONFIG.get(key) for key in keys}
     missing = [k for k, v in values.items() if not v]
     
     if missing:
@@ -41,12 +117,18 @@ def load_env_vars(keys: List[str]) -> Dict[str, str]:
     
     return values
 
-# データベース接続とカーソルを取得する関数
-def get_connection() -> Tuple[mysql.connector.connection.MySQLConnection, mysql.connector.cursor.MySQLCursor]:
-    """データベース接続とカーソルを取得する
+# 設定を取得する関数
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Dict[str, Any]:
+    """環境変数からサーバーの設定を読み込む
+
+    値の検証と変換は初回呼び出し時のみ行い、以降は同じ設定を返す。
 
     Returns:
-        接続オブジェクトとカーソルのタプル
+        設定の辞書
+
+    Raises:
+        ValueError: 必要な環境変数が設定されていない場合
     """
     env = load_env_vars([
         "MYSQL_USER", 
@@ -55,17 +137,353 @@ def get_connection() -> Tuple[mysql.connector.connection.MySQLConnection, mysql.
         "MYSQL_DATABASE"
     ])
     
-    port = int(os.getenv("MYSQL_PORT", DEFAULT_MYSQL_PORT))
+    return {
+        "user": env["MYSQL_USER"],
+        "password": env["MYSQL_PASSWORD"],
+        "host": env["MYSQL_HOST"],
+        "database": env["MYSQL_DATABASE"],
+        "port": int(_CONFIG.get("MYSQL_PORT", DEFAULT_MYSQL_PORT)),
+        "pool_size": int(_CONFIG.get("MYSQL_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        "result_cache_size": int(_CONFIG.get("MYSQL_RESULT_CACHE_SIZE", DEFAULT_RESULT_CACHE_SIZE)),
+        "result_cache_ttl": float(_CONFIG.get("MYSQL_RESULT_CACHE_TTL", DEFAULT_RESULT_CACHE_TTL)),
+        "max_query_length": int(_CONFIG.get("MYSQL_MAX_QUERY_LENGTH", DEFAULT_MAX_QUERY_LENGTH)),
+    }
+
+# コネクションプールを取得する関数
+def get_pool() -> pooling.MySQLConnectionPool:
+    """コネクションプールを取得する
+
+    初回呼び出し時にプールを作成し、以降は同じプールを使い回す。
+
+    Returns:
+        コネクションプール
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            settings = get_settings()
+            
+            # C拡張（libmysqlclient）があれば行の解析はC側で行われる
+            if not mysql.connector.HAVE_CEXT:
+                logger.warning("mysql-connector-python のC拡張が利用できないため、純粋なPython実装で接続します")
+            
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=POOL_NAME,
+                pool_size=settings["pool_size"],
+                user=settings["user"],
+                password=settings["password"],
+                host=settings["host"],
+                database=settings["database"],
+                port=settings["port"],
+                # 読み残した行はカーソルを閉じる際に破棄する
+                consume_results=True
+            )
     
-    conn = mysql.connector.connect(
-        user=env["MYSQL_USER"],
-        password=env["MYSQL_PASSWORD"],
-        host=env["MYSQL_HOST"],
-        database=env["MYSQL_DATABASE"],
-        port=port
-    )
+    return _pool
+
+# DB処理用のスレッドプールを取得する関数
+def get_executor() -> ThreadPoolExecutor:
+    """DB処理を実行するスレッドプールを取得する
+
+    スレッド数をコネクションプールの接続数に揃え、同時実行数が接続数を超えないようにする。
+
+    Returns:
+        スレッドプール
+    """
+    global _executor
+
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings()["pool_size"],
+                thread_name_prefix="mysql"
+            )
+    
+    return _executor
+
+# ブロッキングなDB処理をスレッドプールで実行する関数
+async def run_in_executor(func, *args) -> Any:
+    """ブロッキングな処理をDB処理用のスレッドプールで実行する
+
+    Args:
+        func: 実行する関数
+        *args: 関数に渡す引数
+
+    Returns:
+        関数の戻り値
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args))
+
+# データベース接続とカーソルを取得する関数
+def get_connection() -> Tuple[pooling.PooledMySQLConnection, mysql.connector.cursor.MySQLCursor]:
+    """プールからデータベース接続を借り、カーソルを取得する
+
+    接続の close() はプールへの返却になる。
+
+    Returns:
+        接続オブジェクトとカーソルのタプル
+    """
+    conn = get_pool().get_connection()
+    
+    # 非バッファカーソルで必要な行だけをソケットから読み出す
+    return conn, conn.cursor(dictionary=True, buffered=False)
+
+# orjsonが直接扱えない値をJSONに変換する関数
+def json_default(value: Any) -> Any:
+    """orjsonが直接シリアライズできない値を変換する
+
+    Args:
+        value: シリアライズできなかった値
+
+    Returns:
+        JSONとして出力できる値
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', 'replace')
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+# 1行をJSONへ変換する関数
+def encode_row(row: Dict[str, Any], pretty: bool = False) -> str:
+    """1行分の結果をJSON文字列に変換する
+
+    Args:
+        row: 1行分の結果
+        pretty: 配列の要素としてインデント付きで出力するかどうか
+
+    Returns:
+        JSON文字列
+    """
+    if pretty:
+        encoded = orjson.dumps(row, option=ORJSON_OPTIONS | orjson.OPT_INDENT_2, default=json_default)
+        return encoded.decode().replace("\n", "\n  ")
+    return orjson.dumps(row, option=ORJSON_OPTIONS, default=json_default).decode()
+
+# バイナリカラムをデコードする関数
+def decode_binary_columns(description: List[Tuple], rows: List[Dict[str, Any]]) -> None:
+    """バイナリとして返されるカラムの値だけを文字列にデコードする
+
+    カラム情報から対象カラムを一度だけ判定し、該当カラムがなければ何もしない。
+
+    Args:
+        description: カーソルのカラム情報
+        rows: クエリ結果（その場で書き換える）
+    """
+    binary_cols = [
+        col[0] for col in description
+        if col[1] in BINARY_FIELD_TYPES and col[7] & FieldFlag.BINARY
+    ]
+    if not binary_cols:
+        return
+    
+    for row in rows:
+        for col in binary_cols:
+            value = row[col]
+            if isinstance(value, (bytes, bytearray)):
+                try:
+                    row[col] = value.decode('utf-8')
+                except UnicodeDecodeError as e:
+                    row[col] = f"<表示エラー: {str(e)}>"
+
+# 最大取得行数を検証する関数
+def check_max_rows(max_rows: int) -> None:
+    """最大取得行数が1以上か検証する
+
+    Args:
+        max_rows: 最大取得行数
+
+    Raises:
+        ValueError: 最大取得行数が1未満の場合
+    """
+    if max_rows < 1:
+        raise ValueError(f"max_rows には1以上の値を指定してください（指定値: {max_rows}）")
+
+# クエリの長さを検証する関数
+def check_query_length(query: str) -> None:
+    """クエリが上限の文字数を超えていないか検証する
+
+    Args:
+        query: 実行するSQLクエリ
+
+    Raises:
+        ValueError: クエリが上限の文字数を超えている場合
+    """
+    max_query_length = get_settings()["max_query_length"]
+    if len(query) > max_query_length:
+        raise ValueError(f"クエリが長すぎます（{len(query)} 文字、上限 {max_query_length} 文字）")
+
+# まとめて実行するクエリの長さを検証する関数
+def check_batch_length(queries: List[str]) -> None:
+    """各クエリと、連結して送るバッチ全体が上限の文字数を超えていないか検証する
+
+    Args:
+        queries: 実行するSQLクエリのリスト
+
+    Raises:
+        ValueError: クエリまたはバッチ全体が上限の文字数を超えている場合
+    """
+    for query in queries:
+        check_query_length(query)
+    
+    # 区切り（"\n;\n"）を含めた連結後の文字数
+    max_query_length = get_settings()["max_query_length"]
+    total_length = sum(len(query) for query in queries) + 3 * max(len(queries) - 1, 0)
+    if total_length > max_query_length:
+        raise ValueError(f"クエリの合計が長すぎます（{total_length} 文字、上限 {max_query_length} 文字）")
+
+# SELECTクエリに行数制限を付ける関数
+def add_row_limit(query: str, limit: int) -> str:
+    """LIMIT句のないSELECTクエリに行数制限を付け足す
+
+    LIMIT句を既に含むクエリや、末尾に LIMIT を付けると構文が変わるクエリ
+    （INTO、FOR UPDATE など）はそのまま返す。
+
+    Args:
+        query: 実行するSQLクエリ
+        limit: 取得する最大行数
+
+    Returns:
+        行数制限を付けたSQLクエリ
+    """
+    if not SELECT_PATTERN.match(query):
+        return query
+    
+    body = query.rstrip().rstrip(";")
+    if UNLIMITABLE_PATTERN.search(body):
+        return query
+    
+    # 末尾の行コメントに飲み込まれないよう改行してから付ける
+    return f"{body}\nLIMIT {limit}"
+
+# キャッシュ済みのクエリ結果を取得する関数
+def get_cached_result(query: str, max_rows: int) -> Optional[str]:
+    """キャッシュ済みのフォーマット済み結果を取得する
+
+    Args:
+        query: 実行するSQLクエリ
+        max_rows: 最大取得行数
+
+    Returns:
+        フォーマット済みの結果（キャッシュにない場合はNone）
+    """
+    key = (query.strip(), max_rows)
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        
+        stored_at, result = entry
+        # 有効期限を過ぎた結果は破棄する
+        if time.monotonic() - stored_at > get_settings()["result_cache_ttl"]:
+            del _result_cache[key]
+            return None
+        
+        _result_cache.move_to_end(key)
+    return result
+
+# クエリ結果をキャッシュしてよいか判定する関数
+def is_read_only(query: str) -> bool:
+    """クエリがデータを変更しない読み取り専用の文か判定する
+
+    先頭のキーワードだけでは "SELECT 1; DROP TABLE t" のように後続の文を見逃すため、
+    末尾以外に ; を含むクエリは複数の文とみなして読み取り専用として扱わない。
+
+    Args:
+        query: 判定するSQLクエリ
+
+    Returns:
+        読み取り専用の単一の文である場合はTrue
+    """
+    if not READ_ONLY_PATTERN.match(query):
+        return False
+    return ";" not in query.strip().rstrip(";")
+
+
+def is_cacheable(query: str) -> bool:
+    """クエリ結果をキャッシュしてよいか判定する
+
+    読み取り専用でも、実行時の状態を返す SHOW や、時刻・乱数などに依存する SELECT、
+    INTO やロックを伴う SELECT はキャッシュしない。
+
+    Args:
+        query: 実行されたSQLクエリ
+
+    Returns:
+        キャッシュしてよい場合はTrue
+    """
+    if not is_read_only(query):
+        return False
+    if SHOW_PATTERN.match(query) and not CACHEABLE_SHOW_PATTERN.match(query):
+        return False
+    return UNCACHEABLE_PATTERN.search(query) is None
+
+# キャッシュの世代番号を取得する関数
+def get_cache_generation() -> int:
+    """キャッシュの現在の世代番号を取得する
+
+    Returns:
+        世代番号（クエリ実行前に取得し、cache_result に渡す）
+    """
+    return _result_cache_generation
+
+# クエリ結果をキャッシュする関数
+def cache_result(query: str, max_rows: int, result: str, generation: int) -> None:
+    """キャッシュしてよいクエリのフォーマット済み結果をキャッシュする
+
+    Args:
+        query: 実行されたSQLクエリ
+        max_rows: 最大取得行数
+        result: フォーマット済みの結果
+        generation: クエリ実行前に取得したキャッシュの世代番号
+    """
+    settings = get_settings()
+    cache_size = settings["result_cache_size"]
+    if cache_size <= 0 or settings["result_cache_ttl"] <= 0 or not is_cacheable(query):
+        return
     
-    return conn, conn.cursor(dictionary=True)
+    with _result_cache_lock:
+        # 実行中に他のクエリでキャッシュが破棄された場合は保存しない
+        if generation != _result_cache_generation:
+            return
+        _result_cache[(query.strip(), max_rows)] = (time.monotonic(), result)
+        while len(_result_cache) > cache_size:
+            _result_cache.popitem(last=False)
+
+# キャッシュ済みのクエリ結果を破棄する関数
+def clear_result_cache() -> None:
+    """キャッシュ済みのクエリ結果をすべて破棄する"""
+    global _result_cache_generation
+
+    with _result_cache_lock:
+        _result_cache.clear()
+        _result_cache_generation += 1
+
+# 現在の結果セットから行を取得する関数
+def fetch_rows(cursor: mysql.connector.cursor.MySQLCursor, max_rows: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """現在の結果セットから最大行数まで行を取得する
+
+    Args:
+        cursor: クエリ実行済みのカーソル
+        max_rows: 最大取得行数
+
+    Returns:
+        クエリ結果の辞書のリストと追加データの有無を示すブール値のタプル
+    """
+    results = cursor.fetchmany(size=max_rows + 1)
+    
+    # 最大行数を超えた場合の追加データが存在するかをチェック
+    more_rows_exist = len(results) > max_rows
+    del results[max_rows:]
+    
+    if results:
+        decode_binary_columns(cursor.description, results)
+        
+    return results, more_rows_exist
 
 # SQLクエリを実行して結果を取得する関数
 def execute_query(query: str, max_rows: int = DEFAULT_MAX_ROWS) -> Tuple[List[Dict[str, Any]], bool]:
@@ -79,112 +497,181 @@ def execute_query(query: str, max_rows: int = DEFAULT_MAX_ROWS) -> Tuple[List[Di
         クエリ結果の辞書のリストと追加データの有無を示すブール値のタプル
 
     Raises:
+        ValueError: max_rows が1未満、またはクエリが上限の文字数を超えている場合
         Exception: DB接続またはクエリ実行エラー
     """
+    check_max_rows(max_rows)
+    check_query_length(query)
+    
     conn, cursor = None, None
     
+    # データを変更しうるクエリの場合はキャッシュ済みの結果を破棄する
+    if not is_read_only(query):
+        clear_result_cache()
+    
     try:
         conn, cursor = get_connection()
-        cursor.execute(query)
+        # 最大行数+1行だけを取得し、追加データの有無を判定する
+        cursor.execute(add_row_limit(query, max_rows + 1))
 
         # INSERT、UPDATE、DELETE、CREATEなどのデータ変更クエリの場合はコミットする
-        if any(query.strip().upper().startswith(cmd) for cmd in ["INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER"]):
+        if DML_PATTERN.match(query):
             conn.commit()
 
-        results = cursor.fetchmany(size=max_rows)
+        return fetch_rows(cursor, max_rows)
         
-        # 最大行数を超えた場合の追加データが存在するかをチェック
-        more_rows_exist = cursor.fetchone() is not None
+    finally:
+        # 接続のクリーンアップ（接続はプールへ返却される）
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+        # 実行中に並行して読み取られた変更前の結果がキャッシュに残らないよう、完了後にも破棄する
+        if not is_read_only(query):
+            clear_result_cache()
+
+# 複数のSQLクエリをまとめて実行する関数
+def execute_batch(queries: List[str], max_rows: int = DEFAULT_MAX_ROWS) -> List[Tuple[str, List[Dict[str, Any]], bool]]:
+    """複数のSQLクエリを1回の往復でまとめて実行する
+
+    Args:
+        queries: 実行するSQLクエリのリスト
+        max_rows: クエリごとの最大取得行数
+
+    Returns:
+        クエリ、クエリ結果、追加データの有無のタプルのリスト（結果セットごと）
+
+    Raises:
+        ValueError: max_rows が1未満、クエリが空、またはクエリかバッチ全体が上限の文字数を超えている場合
+        Exception: DB接続またはクエリ実行エラー
+    """
+    check_max_rows(max_rows)
+    check_batch_length(queries)
+    
+    if not queries:
+        raise ValueError("実行するクエリが指定されていません")
+    
+    # 実行する文は queries と同じ順序で並べ、結果セットは位置で元のクエリに対応付ける
+    statements = []
+    for i, query in enumerate(queries, 1):
+        statement = add_row_limit(query.strip().rstrip(";"), max_rows + 1).strip()
+        if not statement:
+            raise ValueError(f"{i} 番目のクエリが空です")
+        statements.append(statement)
+    
+    conn, cursor = None, None
+    
+    # データを変更しうるクエリが含まれる場合はキャッシュ済みの結果を破棄する
+    if not all(is_read_only(query) for query in queries):
+        clear_result_cache()
+    
+    try:
+        conn, cursor = get_connection()
+        # 末尾の行コメントに区切り文字が飲み込まれないよう、区切りは単独の行に置く
+        cursor.execute("\n;\n".join(statements), map_results=True)
+        
+        batch_results = []
+        while True:
+            # クエリ自体に複数の文が含まれる場合など、結果セットがクエリより多い場合は実行された文を示す
+            position = len(batch_results)
+            query = queries[position] if position < len(queries) else cursor.statement
+            if cursor.with_rows:
+                results, more_rows_exist = fetch_rows(cursor, max_rows)
+            else:
+                results, more_rows_exist = [], False
+            batch_results.append((query, results, more_rows_exist))
             
-        return results, more_rows_exist
+            if not cursor.nextset():
+                break
+        
+        # データ変更クエリが含まれる場合はコミットする
+        if any(DML_PATTERN.match(query) for query in queries):
+            conn.commit()
+        
+        return batch_results
         
     finally:
-        # 接続のクリーンアップ
+        # 接続のクリーンアップ（接続はプールへ返却される）
         if cursor:
             cursor.close()
         if conn:
             conn.close()
+        # 実行中に並行して読み取られた変更前の結果がキャッシュに残らないよう、完了後にも破棄する
+        if not all(is_read_only(query) for query in queries):
+            clear_result_cache()
 
 # クエリ結果を読みやすい形式にフォーマットする関数
-def format_query_result(query: str, results: List[Dict[str, Any]], max_length: int = DEFAULT_MAX_LENGTH) -> str:
+def format_query_result(query: str, results: List[Dict[str, Any]], more_rows_exist: bool = False, max_length: int = DEFAULT_MAX_LENGTH, pretty: bool = False) -> str:
     """クエリ結果を読みやすい形式にフォーマットする
 
     Args:
         query: 実行されたSQLクエリ
         results: クエリ結果
+        more_rows_exist: 行数制限により省略された行があるかどうか
         max_length: 出力テキスト全体の最大文字数
+        pretty: JSONをインデント付きで出力するかどうか
 
     Returns:
         フォーマットされた結果文字列
     """
     output_prefix = f"実行されたクエリ: {query}\n\n"
     
-    # 特殊なメッセージが含まれているか確認
-    truncation_message = None
-    data_results = results.copy()
-    more_rows_exist = False
-    
-    for i, row in enumerate(results):
-        if "message" in row and len(row) == 1:
-            truncation_message = row["message"]
-            data_results.pop(i)
-            more_rows_exist = True
-            break
-    
     # 結果がない場合
-    if not data_results:
+    if not results:
         return output_prefix + "結果: 該当するデータはありませんでした。"
     
-    # JSON形式で結果を構築
-    json_results = []
-    for row in data_results:
-        record = {}
-        for header, value in row.items():
-            try:
-                # バイナリデータの場合はデコード
-                if isinstance(value, bytes):
-                    record[header] = value.decode('utf-8')
-                else:
-                    record[header] = value
-            except Exception as e:
-                record[header] = f"<表示エラー: {str(e)}>"
-        json_results.append(record)
-    
-    # 行数制限メッセージを追加
-    if more_rows_exist:
-        json_results.append({
-            "message": "(行数制限により以降は省略されています。max_rows を増やして再実行してください)"
-        })
+    # 合計件数情報
+    count_info = f"\n\n合計 {len(results)} 件のデータが見つかりました。"
     
-    # 結果を文字列に変換
-    result_str = json.dumps(json_results, ensure_ascii=False, indent=2)
+    # 要素の区切りと閉じ括弧（既定では改行やインデントを含まない）
+    if pretty:
+        first_separator, separator, closing = "\n  ", ",\n  ", "\n]"
+    else:
+        first_separator, separator, closing = "", ",", "]"
     
-    # 合計件数情報
-    count_info = f"\n\n合計 {len(data_results)} 件のデータが見つかりました。"
+    # 結果部分に使える文字数（閉じ括弧の分を除く）
+    available_space = max_length - len(output_prefix) - len(count_info) - len(closing)
+    # 文字数制限で省略する場合は省略メッセージ用に余裕を持たせる
+    reserved_space = available_space - 100
     
-    complete_output = output_prefix + result_str + count_info
+    rows = results
+    if more_rows_exist:
+        # 行数制限メッセージを追加
+        rows = itertools.chain(results, [{"message": ROW_LIMIT_MESSAGE}])
     
-    # 文字数制限をチェック
-    if len(complete_output) > max_length:
-        # 結果部分を制限内に切り詰める
-        available_space = max_length - len(output_prefix) - len(count_info) - 100  # 省略メッセージ用に余裕を持たせる
-        truncated_result = result_str[:available_space]
-        
-        # 最後の完全なJSONオブジェクトを探し、それ以降を削除
-        last_bracket = truncated_result.rfind('}')
-        if last_bracket != -1:
-            truncated_result = truncated_result[:last_bracket + 1]
-            
-        # 省略メッセージをJSON構造で追加
-        truncated_result = truncated_result + ',\n  {\n    "message": "(文字数制限により以降は省略。より多くの結果を表示するには別のクエリを使用してください。)"\n  }\n]'
-        
-        return output_prefix + truncated_result + count_info
+    # JSON形式で結果を1行ずつ書き出し、文字数制限に達したら打ち切る
+    # 断片はリストに溜め、最後に1回の join で必要な長さちょうどの文字列を作る
+    parts = ["["]
+    length = 1
+    kept_parts = 1  # 省略メッセージを付け足せる位置
+    truncated = False
+    
+    for i, row in enumerate(rows):
+        chunk = (separator if i else first_separator) + encode_row(row, pretty)
+        length += len(chunk)
+        if length > available_space:
+            truncated = True
+            break
+        parts.append(chunk)
+        if length <= reserved_space:
+            kept_parts = len(parts)
     
-    return complete_output
+    if truncated:
+        # 省略メッセージを付け足せる位置まで戻し、JSON構造で追加
+        del parts[kept_parts:]
+        parts.append(separator if kept_parts > 1 else first_separator)
+        parts.append(encode_row({"message": CHAR_LIMIT_MESSAGE}, pretty))
+    parts.append(closing)
+    
+    return "".join([output_prefix, *parts, count_info])
 
 # MCP サーバーの設定と実行
-def init_mcp_server():
-    """MySQLへのクエリ実行をサポートするMCPサーバーを初期化"""
+def init_mcp_server(pretty: bool = False):
+    """MySQLへのクエリ実行をサポートするMCPサーバーを初期化
+
+    Args:
+        pretty: クエリ結果のJSONをインデント付きで出力するかどうか
+    """
     mcp = FastMCP("MYSQL_MCP_SERVER")
     
     @mcp.tool(
@@ -200,7 +687,7 @@ def init_mcp_server():
             クエリが大量の行を返す場合、末尾に省略メッセージが付与されます。
         """
     )
-    def execute_mysql(query: str, max_rows: int = DEFAULT_MAX_ROWS) -> str:
+    async def execute_mysql(query: str, max_rows: int = DEFAULT_MAX_ROWS) -> List[types.TextContent]:
         """MySQLクエリを実行するMCPツール
 
         Args:
@@ -213,20 +700,20 @@ def init_mcp_server():
         logger.debug("SQLクエリを実行しています")
         
         try:
-            results, more_rows_exist = execute_query(query, max_rows)
+            # 長すぎるクエリはキャッシュの検索などで複製する前に拒否する
+            check_query_length(query)
+            
+            cached_result = get_cached_result(query, max_rows)
+            if cached_result is not None:
+                logger.debug("キャッシュ済みの結果を返します")
+                return [types.TextContent(type="text", text=cached_result)]
+            
+            generation = get_cache_generation()
+            results, more_rows_exist = await run_in_executor(execute_query, query, max_rows)
             
             # 結果をJSONフォーマットで返す
-            json_results = []
-            for row in results:
-                json_results.append(row)
-                
-            # 行数制限メッセージを追加
-            if more_rows_exist:
-                json_results.append({
-                    "message": "(行数制限により以降は省略されています。max_rows を増やして再実行してください)"
-                })
-                
-            formatted_result = format_query_result(query, json_results)
+            formatted_result = format_query_result(query, results, more_rows_exist, pretty=pretty)
+            cache_result(query, max_rows, formatted_result, generation)
             return [types.TextContent(type="text", text=formatted_result)]
             
         except Exception as e:
@@ -234,6 +721,47 @@ def init_mcp_server():
             logger.error(error_message)
             return [types.TextContent(type="text", text=error_message)]
     
+    @mcp.tool(
+        name="execute_mysql_batch",
+        description="""
+        複数の SQL クエリを1回の往復でまとめて実行し、クエリごとの結果を返します。
+        SHOW TABLES と複数の DESCRIBE のように、関連するクエリを続けて実行する場合に使用します。
+
+        Args:
+            queries: 実行する SQL クエリのリスト
+            max_rows: クエリごとの最大取得行数（省略時は100）
+        """
+    )
+    async def execute_mysql_batch(queries: List[str], max_rows: int = DEFAULT_MAX_ROWS) -> List[types.TextContent]:
+        """複数のMySQLクエリをまとめて実行するMCPツール
+
+        Args:
+            queries: 実行するSQLクエリのリスト
+            max_rows: クエリごとの最大取得行数
+
+        Returns:
+            クエリごとのフォーマット済みのクエリ結果
+        """
+        logger.debug(f"{len(queries)} 件のSQLクエリをまとめて実行しています")
+        
+        try:
+            # 長すぎるクエリは連結などで複製する前に拒否する
+            check_batch_length(queries)
+            
+            contents = []
+            generation = get_cache_generation()
+            batch_results = await run_in_executor(execute_batch, queries, max_rows)
+            for query, results, more_rows_exist in batch_results:
+                formatted_result = format_query_result(query, results, more_rows_exist, pretty=pretty)
+                cache_result(query, max_rows, formatted_result, generation)
+                contents.append(types.TextContent(type="text", text=formatted_result))
+            return contents
+            
+        except Exception as e:
+            error_message = f"エラー: {str(e)}"
+            logger.error(error_message)
+            return [types.TextContent(type="text", text=error_message)]
+    
     return mcp
 
 def run_server(mcp, transport: str = "stdio", port: int = DEFAULT_PORT):
@@ -257,11 +785,13 @@ def main():
     parser = argparse.ArgumentParser(description="MySQL MCP Server")
     parser.add_argument("--sse", action="store_true", help="SSEトランスポートで起動")
     parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="SSEポート番号")
+    parser.add_argument("--pretty", action="store_true", help="クエリ結果のJSONをインデント付きで出力")
     args = parser.parse_args()
     
     logger.info("MySQL MCPサーバーを起動中")
     
-    mcp = init_mcp_server()
+    pretty = args.pretty or _CONFIG.get("MYSQL_MCP_PRETTY") == "1"
+    mcp = init_mcp_server(pretty=pretty)
     transport = "sse" if args.sse else "stdio"
     run_server(mcp, transport=transport, port=args.port)
 